@@ -10,33 +10,82 @@ compressed with gzip for additional space savings.
 """
 
 import csv
-import json
+import glob
+import gzip
 import sys
 import os
 import re
+import tempfile
 from pathlib import Path
-from collections import defaultdict
+from contextlib import closing, contextmanager
+from functools import partial
+from itertools import chain, compress as select, islice
+from multiprocessing import Pool
+from operator import itemgetter
 import argparse
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+    import json
+
+
+def load_json(f):
+    """Parse JSON from a binary file object."""
+    if orjson is not None:
+        return orjson.loads(f.read())
+    return json.load(f)
+
+
+def dump_json(obj):
+    """Serialize an object to compact UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    # Like orjson, emit non-ASCII as raw UTF-8 instead of \uXXXX escapes
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+# Top-level fields written ahead of the Sessions array in every output file
+OUTPUT_HEADER = {
+    "Version": "5.10.50.85",
+    "ElectionId": "November 8 2022 General Election",
+}
+
+# Ballot rows are scanned column-by-column in chunks of this many rows
+BALLOT_CHUNK_ROWS = 4096
+
+# Candidate header cell: "CANDIDATE NAME(rank)"
+CANDIDATE_RANK_RE = re.compile(r'^(.*)\((\d+)\)\Z', re.DOTALL)
+
+# A comma-split cell that opens a quote ('"' or '="') but doesn't close it,
+# meaning the split cut through a quoted comma
+UNBALANCED_QUOTE_RE = re.compile(rb'(?<![^,])=?"(?![^,]*",)(?![^,]*"$)')
+
+# Raw (undecoded) mark cell values that are known not to be votes
+BLANK_MARKS = frozenset((b'', b'0', b'"0"', b'""', b'="0"', b'=""'))
+
+# Characters of the ="..." wrapping, deleted from mark cells in a single pass
+MARK_STRIP_CHARS = b'="'
+
 
 def parse_candidate_manifest(manifest_path):
     """Load candidate manifest to get candidate IDs."""
-    with open(manifest_path) as f:
-        data = json.load(f)
+    with open(manifest_path, 'rb') as f:
+        data = load_json(f)
     
     # Build lookup: (contest_id, normalized_name) -> candidate_id
     candidates = {}
     for c in data['List']:
-        name = c['Description'].upper().strip()
-        candidates[(c['ContestId'], name)] = c['Id']
+        candidates[(c['ContestId'], normalize_name(c['Description']))] = c['Id']
     
     return candidates
 
 
 def parse_contest_manifest(manifest_path):
     """Load contest manifest to get contest IDs and identify RCV contests."""
-    with open(manifest_path) as f:
-        data = json.load(f)
+    with open(manifest_path, 'rb') as f:
+        data = load_json(f)
     
     # Build lookup: contest_description -> contest_id
     contests = {}
@@ -47,12 +96,103 @@ def parse_contest_manifest(manifest_path):
     return contests
 
 
+def find_writein_candidates(candidates):
+    """Map each contest_id to its first write-in candidate_id."""
+    # Names are already normalized by parse_candidate_manifest
+    writeins = {}
+    for (contest_id, name), candidate_id in candidates.items():
+        if 'WRITE' in name:
+            writeins.setdefault(contest_id, candidate_id)
+    return writeins
+
+
+def find_contest_id(contest_name, contests):
+    """Match a CSV contest header against the contest manifest descriptions."""
+    for desc, cid in contests.items():
+        if desc in contest_name or contest_name in desc:
+            return cid
+    return None
+
+
 def normalize_name(name):
     """Normalize candidate name for matching."""
     return name.upper().strip()
 
 
-def process_csv_file(csv_path, candidates, contests, rcv_only=True):
+def make_mark(candidate_id, rank):
+    """Build a NIST SP 1500 mark for a counted vote."""
+    return {
+        "CandidateId": candidate_id,
+        "Rank": rank,
+        "MarkDensity": 100,
+        "IsAmbiguous": False,
+        "IsVote": True
+    }
+
+
+def is_vote_cell(val):
+    """Whether a raw mark cell (e.g. b'1' or b'="1"') records a vote."""
+    try:
+        return int(val.translate(None, MARK_STRIP_CHARS).strip()) > 0
+    except ValueError:
+        return False
+
+
+def column_getter(cols):
+    """Return a function that pulls the given columns out of a row as a tuple."""
+    if len(cols) == 1:
+        col = cols[0]
+        return lambda row: (row[col],)
+    return itemgetter(*cols)
+
+
+def decode_lines(lines):
+    """Decode UTF-8 lines read from a binary file."""
+    for line in lines:
+        yield line.decode('utf-8')
+
+
+def split_rows(lines, width, min_width=0):
+    """
+    Split binary CSV lines into rows of undecoded cells.
+    
+    CVR ballot rows are plain comma-separated values, so splitting on commas
+    is enough whenever it produces the expected number of fields and no cell
+    has an unclosed quote. Any other line has quoted commas or line breaks
+    and is parsed by the csv module, which reads continuation lines from the
+    same iterator.
+    
+    Rows shorter than min_width are padded with empty cells, so callers can
+    index any column below min_width without a bounds check.
+    """
+    lines = iter(lines)
+    for line in lines:
+        line_body = line.rstrip(b'\r\n')
+        row = line_body.split(b',')
+        if len(row) != width or (b'"' in line_body and UNBALANCED_QUOTE_RE.search(line_body)):
+            row = next(csv.reader(decode_lines(chain((line,), lines))), [])
+            row = [cell.encode('utf-8') for cell in row]
+        if len(row) < min_width:
+            row += [b''] * (min_width - len(row))
+        yield row
+
+
+def last_int_cell(rows, col, start, stop):
+    """
+    Integer value of the last rows[start:stop] cell in column col that holds
+    one, or None if none does.
+    """
+    for i in range(stop - 1, start - 1, -1):
+        val = rows[i][col].strip(b'="')
+        if val:
+            try:
+                return int(val)
+            except ValueError:
+                pass
+    return None
+
+
+def process_csv_file(csv_path, candidates, contests, rcv_only=True, writeins=None):
     """
     Process a single CSV file and yield sessions in JSON format.
     
@@ -61,9 +201,16 @@ def process_csv_file(csv_path, candidates, contests, rcv_only=True):
         candidates: Dict mapping (contest_id, name) -> candidate_id
         contests: Dict mapping contest_description -> contest_id
         rcv_only: If True, only include RCV contests
+        writeins: Dict mapping contest_id -> write-in candidate_id, as built
+            by find_writein_candidates (computed here if not given)
     """
-    with open(csv_path, newline='', encoding='utf-8') as f:
-        reader = csv.reader(f)
+    if writeins is None:
+        writeins = find_writein_candidates(candidates)
+    
+    # Only the header rows and the few metadata cells of ballots with votes
+    # are decoded; mark cells are classified as raw bytes
+    with open(csv_path, 'rb') as f:
+        reader = csv.reader(decode_lines(f))
         rows = []
         for i, row in enumerate(reader):
             rows.append(row)
@@ -82,6 +229,10 @@ def process_csv_file(csv_path, candidates, contests, rcv_only=True):
         # col_idx -> (contest_id, candidate_id, rank)
         col_mapping = {}
         
+        # Every column of a contest repeats its name, so each distinct header
+        # is matched against the manifest only once
+        contest_ids = {}
+        
         for col_idx, (contest_name, cand_str) in enumerate(zip(contests_row, candidates_row)):
             # Check if this is an RCV contest
             is_rcv = '(RCV)' in contest_name or 'Number of ranks' in contest_name
@@ -89,38 +240,61 @@ def process_csv_file(csv_path, candidates, contests, rcv_only=True):
                 continue
             
             # Find contest ID
-            contest_id = None
-            for desc, cid in contests.items():
-                if desc in contest_name or contest_name in desc:
-                    contest_id = cid
-                    break
+            if contest_name in contest_ids:
+                contest_id = contest_ids[contest_name]
+            else:
+                contest_id = find_contest_id(contest_name, contests)
+                contest_ids[contest_name] = contest_id
             
             if contest_id is None:
                 continue
             
             # Parse candidate name and rank from "CANDIDATE NAME(rank)"
-            if '(' in cand_str and cand_str.endswith(')'):
-                paren_idx = cand_str.rfind('(')
-                candidate_name = normalize_name(cand_str[:paren_idx])
-                try:
-                    rank = int(cand_str[paren_idx+1:-1])
-                except ValueError:
-                    continue
-                
-                # Find candidate ID
-                candidate_id = candidates.get((contest_id, candidate_name))
+            match = CANDIDATE_RANK_RE.match(cand_str)
+            if not match:
+                continue
+            candidate_name = normalize_name(match.group(1))
+            rank = int(match.group(2))
+            
+            # Find candidate ID
+            candidate_id = candidates.get((contest_id, candidate_name))
+            if candidate_id is None:
+                # Try write-in
+                if 'WRITE-IN' in candidate_name:
+                    candidate_id = writeins.get(contest_id)
                 if candidate_id is None:
-                    # Try write-in
-                    if 'WRITE-IN' in candidate_name or candidate_name == 'WRITE-IN':
-                        for (cid, name), candidate_id in candidates.items():
-                            if cid == contest_id and 'WRITE' in name.upper():
-                                break
-                        else:
-                            continue
-                    else:
-                        continue
+                    continue
                 
-                col_mapping[col_idx] = (contest_id, candidate_id, rank)
+            col_mapping[col_idx] = (contest_id, candidate_id, rank)
+        
+        if not col_mapping:
+            return
+        
+        # Scan columns grouped by contest and then by rank, so each ballot's
+        # marks are collected already in rank order
+        contest_order = {}
+        for contest_id, _, _ in col_mapping.values():
+            contest_order.setdefault(contest_id, len(contest_order))
+        mark_cols = sorted(
+            col_mapping,
+            key=lambda col: (contest_order[col_mapping[col][0]], col_mapping[col][2])
+        )
+        
+        # Mark cells are fetched in one C-level call per row rather than
+        # indexed one at a time
+        get_marks = column_getter(mark_cols)
+        
+        # Only a few hundred distinct (candidate_id, rank) marks exist, so
+        # build each once and share it across every ballot that has it
+        mark_cache = {
+            (candidate_id, rank): make_mark(candidate_id, rank)
+            for _, candidate_id, rank in col_mapping.values()
+        }
+        
+        # Parallel per-column lists, in scan order: the contest each column
+        # belongs to and the mark it records
+        mark_contests = [col_mapping[col][0] for col in mark_cols]
+        mark_dicts = [mark_cache[col_mapping[col][1:]] for col in mark_cols]
         
         # Find record ID column
         record_id_col = None
@@ -141,88 +315,293 @@ def process_csv_file(csv_path, candidates, contests, rcv_only=True):
         if match:
             tabulator_id = int(match.group(1))
         
-        # Process ballot rows
-        f.seek(0)
-        reader = csv.reader(f)
-        for _ in range(4):  # Skip header rows
-            next(reader)
+        # Process ballot rows; the file is already past the header rows
+        # Every ballot row is at least row_width cells wide (split_rows pads
+        # irregular ones), so mark and metadata cells are indexed unchecked
+        row_width = max(len(headers_row), max(mark_cols) + 1)
+        ballot_rows = split_rows(f, len(headers_row), row_width)
         
-        for row_idx, row in enumerate(reader):
-            # Get ballot metadata
-            record_id = row_idx + 1
-            if record_id_col and record_id_col < len(row):
-                val = row[record_id_col].strip('="')
-                if val:
-                    record_id = val
+        # Raw mark cell -> whether it counts as a vote. Exports only use a
+        # handful of distinct cell values, so each is parsed once per file
+        # and every other cell is classified by a C-level dict lookup.
+        vote_cells = dict.fromkeys(BLANK_MARKS, False)
+        
+        row_offset = 0
+        while True:
+            chunk = list(islice(ballot_rows, BALLOT_CHUNK_ROWS))
+            if not chunk:
+                break
             
-            batch_id = 1
-            if batch_col and batch_col < len(row):
-                val = row[batch_col].strip('="')
-                if val:
-                    try:
-                        batch_id = int(val)
-                    except:
-                        pass
+            # Transpose the chunk's mark cells into columns. The CSV is sparse,
+            # so each column only has a handful of non-blank cells and those
+            # are found without a Python-level step per cell.
+            columns = zip(*map(get_marks, chunk), strict=True)
+            row_indices = range(len(chunk))
             
-            if tabulator_col and tabulator_col < len(row):
-                val = row[tabulator_col].strip('="')
-                if val:
-                    try:
-                        tabulator_id = int(val)
-                    except:
-                        pass
+            # chunk row index -> [index into mark_contests/mark_dicts]
+            row_marks = {}
+            for k, column in enumerate(columns):
+                for val in set(column).difference(vote_cells):
+                    vote_cells[val] = is_vote_cell(val)
+                for i in select(row_indices, map(vote_cells.__getitem__, column)):
+                    row_marks.setdefault(i, []).append(k)
             
-            # Collect marks by contest
-            contest_marks = defaultdict(list)  # contest_id -> [(candidate_id, rank)]
+            # Rows of this chunk already searched for a TabulatorNum
+            tabulator_rows = 0
             
-            for col_idx, (contest_id, candidate_id, rank) in col_mapping.items():
-                if col_idx < len(row):
-                    val = row[col_idx].strip('="').strip()
-                    if val and val != '0':
+            for i in sorted(row_marks):
+                row = chunk[i]
+                
+                # Get ballot metadata
+                record_id = row_offset + i + 1
+                if record_id_col:
+                    val = row[record_id_col].strip(b'="')
+                    if val:
+                        record_id = val.decode('utf-8')
+                
+                batch_id = 1
+                if batch_col:
+                    val = row[batch_col].strip(b'="')
+                    if val:
                         try:
-                            if int(val) > 0:
-                                contest_marks[contest_id].append((candidate_id, rank))
+                            batch_id = int(val)
                         except:
                             pass
+                
+                # A ballot without a usable TabulatorNum keeps the last one
+                # seen on any earlier row, voted or not
+                if tabulator_col:
+                    val = last_int_cell(chunk, tabulator_col, tabulator_rows, i + 1)
+                    if val is not None:
+                        tabulator_id = val
+                    tabulator_rows = i + 1
+                
+                # Collect marks by contest
+                contest_marks = {}  # contest_id -> [mark]
+                for k in row_marks[i]:
+                    contest_marks.setdefault(mark_contests[k], []).append(mark_dicts[k])
+                
+                # Contests are listed in the order of their first marked
+                # column on this ballot, which differs from the scan order
+                # when contest columns are interleaved
+                ballot_contests = list(contest_marks)
+                if len(ballot_contests) > 1:
+                    first_cols = {}  # contest_id -> first marked column
+                    for k in row_marks[i]:
+                        contest_id = mark_contests[k]
+                        first_cols[contest_id] = min(first_cols.get(contest_id, mark_cols[k]), mark_cols[k])
+                    ballot_contests.sort(key=first_cols.__getitem__)
+                
+                # Build session object
+                contests_list = []
+                for contest_id in ballot_contests:
+                    contests_list.append({
+                        "Id": contest_id,
+                        "Marks": contest_marks[contest_id]
+                    })
+                
+                yield {
+                    "TabulatorId": tabulator_id,
+                    "BatchId": batch_id,
+                    "RecordId": str(record_id),
+                    "CountingGroupId": 1,
+                    "Original": {
+                        "PrecinctPortionId": 0,
+                        "BallotTypeId": 0,
+                        "IsCurrent": True,
+                        "Contests": contests_list
+                    }
+                }
             
-            # Skip ballots with no RCV votes
-            if not contest_marks:
-                continue
-            
-            # Build session object
-            contests_list = []
-            for contest_id, marks in contest_marks.items():
-                marks.sort(key=lambda x: x[1])  # Sort by rank
-                contests_list.append({
-                    "Id": contest_id,
-                    "Marks": [
-                        {
-                            "CandidateId": cid,
-                            "Rank": rank,
-                            "MarkDensity": 100,
-                            "IsAmbiguous": False,
-                            "IsVote": True
-                        }
-                        for cid, rank in marks
-                    ]
-                })
+            if tabulator_col:
+                val = last_int_cell(chunk, tabulator_col, tabulator_rows, len(chunk))
+                if val is not None:
+                    tabulator_id = val
             
-            yield {
-                "TabulatorId": tabulator_id,
-                "BatchId": batch_id,
-                "RecordId": str(record_id),
-                "CountingGroupId": 1,
-                "Original": {
-                    "PrecinctPortionId": 0,
-                    "BallotTypeId": 0,
-                    "IsCurrent": True,
-                    "Contests": contests_list
-                }
-            }
+            row_offset += len(chunk)
 
 
-def convert_directory(input_dir, output_path, rcv_only=True, compress=False):
-    """Convert all CSV files in a directory to a single JSON file."""
+@contextmanager
+def open_output(path, compress):
+    """
+    Open an output file for writing bytes, gzip-compressed if requested.
+    
+    Data is written to a .tmp file beside path, which replaces path only
+    once the block completes. On error the .tmp file is removed, so a failed
+    run never leaves a truncated document behind.
+    """
+    tmp_path = path.with_name(path.name + '.tmp')
+    try:
+        with open(tmp_path, 'wb') as raw:
+            if compress:
+                # Level 1 keeps compression from bottlenecking the write; a
+                # fixed mtime makes the archive byte-for-byte reproducible. The
+                # header records the final name rather than the .tmp one.
+                with gzip.GzipFile(path.name, 'wb', compresslevel=1,
+                                   fileobj=raw, mtime=0) as f:
+                    yield f
+            else:
+                yield raw
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    os.replace(tmp_path, path)
+
+
+def open_input(path):
+    """Open a file written by open_output for reading bytes."""
+    with open(path, 'rb') as f:
+        is_gzip = f.read(2) == b'\x1f\x8b'
+    return gzip.open(path, 'rb') if is_gzip else open(path, 'rb')
+
+
+def sessions_prefix():
+    """Bytes that open an output document, up to the Sessions array."""
+    return dump_json(OUTPUT_HEADER)[:-1] + b',"Sessions":['
+
+
+def split_output_name(output_path):
+    """
+    Split an output file name into its stem and JSON extension.
+    
+    Only .json and .json.gz are treated as extensions, so dotted names keep
+    their dots: sf-2024.11.05.json.gz -> (sf-2024.11.05, .json.gz). Any other
+    name is kept whole, with .json as the extension.
+    """
+    name = output_path.name
+    for ext in ('.json.gz', '.json'):
+        if name.endswith(ext) and len(name) > len(ext):
+            return name[:-len(ext)], ext
+    return name, '.json'
+
+
+def shard_path(output_path, index):
+    """Path of the index-th shard: out.json.gz -> out.part-000.json.gz."""
+    stem, ext = split_output_name(output_path)
+    return output_path.with_name(f"{stem}.part-{index:03d}{ext}")
+
+
+def stale_shard_paths(output_path, shard_count):
+    """Shards of output_path left over from an earlier run with more files."""
+    stem, ext = split_output_name(output_path)
+    pattern = re.compile(re.escape(stem) + r'\.part-(\d{3,})' + re.escape(ext))
+    for path in output_path.parent.glob(f"{glob.escape(stem)}.part-*{ext}"):
+        match = pattern.fullmatch(path.name)
+        if match and int(match.group(1)) >= shard_count:
+            yield path
+
+
+def shard_manifest_path(output_path):
+    """
+    Path of the shard manifest: out.json.gz -> out.json.gz.manifest.json.
+    
+    The full output name is kept so .json and .json.gz runs into the same
+    directory don't share a manifest.
+    """
+    return output_path.with_name(f"{output_path.name}.manifest.json")
+
+
+# (candidates, contests, rcv_only, writeins) shared by every file a worker converts
+_worker_args = None
+
+
+def init_worker(candidates, contests, rcv_only, writeins):
+    """Pool initializer: receive the manifests once per worker process."""
+    global _worker_args
+    _worker_args = (candidates, contests, rcv_only, writeins)
+
+
+def write_sessions(f, sessions, count=0):
+    """
+    Serialize sessions into an open Sessions array, one at a time.
+    
+    count is the number of sessions already in the array; returns the new
+    total.
+    """
+    for session in sessions:
+        if count:
+            f.write(b',')
+        f.write(dump_json(session))
+        count += 1
+    return count
+
+
+def convert_csv_file(task):
+    """
+    Convert a single CSV file into a shard document.
+    
+    task is (csv_path, shard, compress); sessions are streamed into shard as
+    they are read. Returns (csv_path, session_count).
+    """
+    csv_path, shard, compress = task
+    with open_output(shard, compress) as f:
+        f.write(sessions_prefix())
+        count = write_sessions(f, process_csv_file(csv_path, *_worker_args))
+        f.write(b']}')
+    return csv_path, count
+
+
+def convert_csv_files(tasks, jobs, worker_args):
+    """
+    Run convert_csv_file over tasks and yield the results in task order.
+    
+    With more than one job the files are converted in a process pool, which
+    is terminated as soon as the generator is closed.
+    """
+    if jobs > 1:
+        with Pool(jobs, initializer=init_worker, initargs=worker_args) as pool:
+            yield from pool.imap(convert_csv_file, tasks)
+    else:
+        init_worker(*worker_args)
+        yield from map(convert_csv_file, tasks)
+
+
+def concat_shards(shards, output_path, compress):
+    """
+    Join shard documents into a single output file.
+    
+    Each shard's Sessions array is copied byte-for-byte between the shared
+    header and the closing brackets, without parsing any sessions.
+    
+    Args:
+        shards: (shard_path, session_count) pairs, in output order
+        output_path: Path of the combined JSON file
+        compress: If True, gzip the combined file
+    """
+    prefix = sessions_prefix()
+    first = True
+    with open_output(output_path, compress) as out:
+        out.write(prefix)
+        for path, count in shards:
+            if not count:
+                continue
+            with open_input(path) as src:
+                if src.read(len(prefix)) != prefix:
+                    raise ValueError(f"{path} does not start with the expected header")
+                if not first:
+                    out.write(b',')
+                first = False
+                # Copy everything but the trailing ']}'
+                tail = b''
+                for block in iter(partial(src.read, 1 << 20), b''):
+                    block = tail + block
+                    out.write(block[:-2])
+                    tail = block[-2:]
+                if tail != b']}':
+                    raise ValueError(f"{path} does not end with the Sessions array")
+        out.write(b']}')
+
+
+def convert_directory(input_dir, output_path, rcv_only=True, compress=False, jobs=None,
+                      shard_per_file=False, concat=False):
+    """
+    Convert all CSV files in a directory to JSON.
+    
+    By default all sessions go into a single JSON file. With shard_per_file,
+    each CSV file is written to its own shard next to output_path
+    (out.part-000.json, ...), listed in out.json.manifest.json; with concat as
+    well, the shards are then joined into output_path.
+    """
     input_dir = Path(input_dir)
     
     # Load manifests
@@ -239,6 +618,7 @@ def convert_directory(input_dir, output_path, rcv_only=True, compress=False):
     
     candidates = parse_candidate_manifest(candidate_manifest)
     contests = parse_contest_manifest(contest_manifest)
+    writeins = find_writein_candidates(candidates)
     
     print(f"Loaded {len(candidates)} candidates and {len(contests)} contests")
     
@@ -250,34 +630,77 @@ def convert_directory(input_dir, output_path, rcv_only=True, compress=False):
     
     print(f"Found {len(csv_files)} CSV files to process")
     
-    # Process and collect all sessions
-    all_sessions = []
-    for i, csv_path in enumerate(csv_files, 1):
-        print(f"Processing {csv_path.name} ({i}/{len(csv_files)})...")
-        count = 0
-        for session in process_csv_file(csv_path, candidates, contests, rcv_only):
-            all_sessions.append(session)
-            count += 1
-        print(f"  -> {count} ballots with RCV votes")
+    output_path = Path(output_path)
+    compress = compress or output_path.suffix == '.gz'
+    jobs = min(jobs or os.cpu_count() or 1, len(csv_files))
+    worker_args = (candidates, contests, rcv_only, writeins)
     
-    print(f"\nTotal sessions: {len(all_sessions)}")
+    def report(i, csv_path, count):
+        print(f"Processed {csv_path.name} ({i}/{len(csv_files)})")
+        print(f"  -> {count} ballots with RCV votes")
     
-    # Build output JSON
-    output = {
-        "Version": "5.10.50.85",
-        "ElectionId": "November 8 2022 General Election",
-        "Sessions": all_sessions
-    }
+    def convert_to_shards(shard_paths, shard_compress):
+        # Files are independent given the manifests, so workers convert them
+        # in parallel, each streaming into its own shard. Results come back in
+        # file order to keep the output deterministic.
+        tasks = [(csv_path, shard, shard_compress) for csv_path, shard in zip(csv_files, shard_paths, strict=True)]
+        shards = []
+        with closing(convert_csv_files(tasks, jobs, worker_args)) as results:
+            for i, ((csv_path, count), shard) in enumerate(zip(results, shard_paths, strict=True), 1):
+                report(i, csv_path, count)
+                shards.append((shard, count))
+        return shards
     
-    # Write output
-    output_path = Path(output_path)
-    if compress or output_path.suffix == '.gz':
-        import gzip
-        with gzip.open(output_path, 'wt', encoding='utf-8') as f:
-            json.dump(output, f, separators=(',', ':'))
+    if shard_per_file:
+        shards = convert_to_shards(
+            [shard_path(output_path, i) for i in range(len(csv_files))], compress
+        )
+        total = sum(count for _, count in shards)
+        print(f"\nTotal sessions: {total}")
+        
+        manifest_path = shard_manifest_path(output_path)
+        with open_output(manifest_path, False) as f:
+            f.write(dump_json({
+                **OUTPUT_HEADER,
+                "Shards": [
+                    {"Path": shard.name, "Source": csv_path.name, "Sessions": count}
+                    for csv_path, (shard, count) in zip(csv_files, shards, strict=True)
+                ]
+            }))
+        print(f"\nWritten {len(shards)} shards listed in {manifest_path}")
+        
+        # An earlier run over more files leaves shards the manifest no longer
+        # lists; shards below len(shards) were just overwritten
+        for stale in list(stale_shard_paths(output_path, len(shards))):
+            stale.unlink()
+            print(f"Removed stale shard {stale}")
+        if not concat:
+            return True
+        concat_shards(shards, output_path, compress)
+    elif jobs > 1:
+        # Workers stream into temporary shards beside the output, which are
+        # then copied into it, so no process holds a whole file's sessions.
+        # The shards are gzipped like the output, so the temporary space
+        # needed stays about the size of the output itself.
+        with tempfile.TemporaryDirectory(dir=output_path.parent) as tmp_dir:
+            ext = '.json.gz' if compress else '.json'
+            shards = convert_to_shards(
+                [Path(tmp_dir) / f"part-{i:03d}{ext}" for i in range(len(csv_files))], compress
+            )
+            total = sum(count for _, count in shards)
+            concat_shards(shards, output_path, compress)
+        print(f"\nTotal sessions: {total}")
     else:
-        with open(output_path, 'w') as f:
-            json.dump(output, f, separators=(',', ':'))
+        # Sessions are streamed straight into the array as they are read
+        total = 0
+        with open_output(output_path, compress) as f:
+            f.write(sessions_prefix())
+            for i, csv_path in enumerate(csv_files, 1):
+                before = total
+                total = write_sessions(f, process_csv_file(csv_path, *worker_args), total)
+                report(i, csv_path, total - before)
+            f.write(b']}')
+        print(f"\nTotal sessions: {total}")
     
     print(f"\nWritten to {output_path}")
     print(f"Output size: {output_path.stat().st_size / 1024 / 1024:.1f} MB")
@@ -293,14 +716,30 @@ def main():
                         help='Include all contests, not just RCV')
     parser.add_argument('--compress', action='store_true',
                         help='Compress output with gzip')
+    parser.add_argument('--jobs', type=int, default=None,
+                        help='Number of CSV files to convert in parallel (default: CPU count); '
+                             'with more than one, each file is staged in a temporary shard '
+                             'next to the output, needing about as much free space as the output')
+    parser.add_argument('--shard-per-file', action='store_true',
+                        help='Write each CSV file to its own shard next to the output, '
+                             'plus a manifest listing the shards')
+    parser.add_argument('--concat', action='store_true',
+                        help='With --shard-per-file, also join the shards into the output file')
     
     args = parser.parse_args()
+    if args.jobs is not None and args.jobs < 1:
+        parser.error('--jobs must be at least 1')
+    if args.concat and not args.shard_per_file:
+        parser.error('--concat requires --shard-per-file')
     
     success = convert_directory(
         args.input_dir,
         args.output,
         rcv_only=not args.all_contests,
-        compress=args.compress
+        compress=args.compress,
+        jobs=args.jobs,
+        shard_per_file=args.shard_per_file,
+        concat=args.concat
     )
     
     sys.exit(0 if success else 1)
@@ -0,0 +1,265 @@
+"""
+Tests for scripts/convert_csv_to_json.py.
+
+Run from the report_pipeline directory with:
+
+    python -m unittest discover tests
+"""
+
+import gzip
+import io
+import json
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from unittest import mock
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
+
+import convert_csv_to_json as converter  # noqa: E402
+
+
+HEADER_ROWS = (
+    '"Election",5.10,,,,\n'
+    ',,,"Mayor (RCV)","Mayor (RCV)","Mayor (RCV)"\n'
+    ',,,"Alice(1)","Bob(1)","Alice(2)"\n'
+    'CvrNumber,BatchId,ImprintedId,Mark1,Mark2,Mark3\n'
+)
+
+CANDIDATES = {(1, 'ALICE'): 11, (1, 'BOB'): 12}
+CONTESTS = {'Mayor': 1}
+
+
+def convert_rows(body, header=HEADER_ROWS, candidates=CANDIDATES, contests=CONTESTS):
+    """Run process_csv_file over a CVR file made of header and body."""
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = Path(tmp) / 'CVR_Export_T1.csv'
+        csv_path.write_text(header + body, encoding='utf-8')
+        return list(converter.process_csv_file(csv_path, candidates, contests))
+
+
+def write_input_dir(input_dir, bodies):
+    """Write manifests for CANDIDATES and CONTESTS plus one CVR file per body."""
+    (input_dir / 'CandidateManifest.json').write_text(json.dumps({'List': [
+        {'Description': name, 'Id': candidate_id, 'ContestId': contest_id}
+        for (contest_id, name), candidate_id in CANDIDATES.items()
+    ]}))
+    (input_dir / 'ContestManifest.json').write_text(json.dumps({'List': [
+        {'Description': desc, 'Id': contest_id} for desc, contest_id in CONTESTS.items()
+    ]}))
+    for i, body in enumerate(bodies):
+        (input_dir / f'CVR_Export_T{i}.csv').write_bytes(HEADER_ROWS.encode() + body)
+
+
+def convert_dir(input_dir, output_path, **kwargs):
+    """Run convert_directory without its progress output."""
+    with redirect_stdout(io.StringIO()):
+        return converter.convert_directory(input_dir, output_path, **kwargs)
+
+
+def marks(session):
+    """(candidate_id, rank) pairs of a session's single contest."""
+    [contest] = session['Original']['Contests']
+    return [(mark['CandidateId'], mark['Rank']) for mark in contest['Marks']]
+
+
+class SplitRowsTest(unittest.TestCase):
+    def test_quoted_comma_in_short_row_is_not_shifted(self):
+        # One cell short, so splitting inside "a,b" yields exactly the header
+        # width; the row must still be parsed by the csv module
+        [session] = convert_rows('1,2,"a,b",1,0\n')
+        self.assertEqual(marks(session), [(11, 1)])
+
+    def test_plain_and_formula_quoted_cells(self):
+        [session] = convert_rows('1,2,="x",0,="1",="1"\n')
+        self.assertEqual(marks(session), [(12, 1), (11, 2)])
+
+    def test_unbalanced_quote_falls_back_to_csv(self):
+        rows = list(converter.split_rows([b'1,"a,b"\n', b'1,"x",2\n'], 3))
+        self.assertEqual(rows, [[b'1', b'a,b'], [b'1', b'"x"', b'2']])
+
+
+class CandidateHeaderTest(unittest.TestCase):
+    def test_line_break_in_candidate_cell(self):
+        header = HEADER_ROWS.replace('"Bob(1)"', '"Bob\n(1)"')
+        [session] = convert_rows('1,2,3,0,1,0\n', header)
+        self.assertEqual(marks(session), [(12, 1)])
+
+    def test_trailing_whitespace_after_rank_is_skipped(self):
+        header = HEADER_ROWS.replace('"Bob(1)"', '"Bob(1) "')
+        self.assertEqual(convert_rows('1,2,3,0,1,0\n', header), [])
+
+
+class BallotMetadataTest(unittest.TestCase):
+    def test_missing_tabulator_uses_last_row_with_one(self):
+        header = HEADER_ROWS.replace(
+            'CvrNumber,BatchId,ImprintedId', 'CvrNumber,TabulatorNum,BatchId'
+        )
+        body = '1,3,1,1,0,0\n2,5,1,0,0,0\n3,,1,0,1,0\n'
+        # The unvoted row with TabulatorNum 5 sits in the same chunk as the
+        # ballot after it, or ends the previous chunk
+        for chunk_rows in (4096, 2):
+            with self.subTest(chunk_rows=chunk_rows), \
+                    mock.patch.object(converter, 'BALLOT_CHUNK_ROWS', chunk_rows):
+                sessions = convert_rows(body, header)
+                self.assertEqual(
+                    [(s['RecordId'], s['TabulatorId']) for s in sessions],
+                    [('1', 3), ('3', 5)]
+                )
+
+
+class ContestOrderTest(unittest.TestCase):
+    def test_contests_follow_first_marked_column(self):
+        # Council's only column sits between Mayor's rank 1 and rank 2
+        header = HEADER_ROWS.replace(
+            '"Mayor (RCV)","Mayor (RCV)","Mayor (RCV)"', '"Mayor (RCV)","Council (RCV)","Mayor (RCV)"'
+        ).replace('"Bob(1)"', '"Dan(1)"')
+        candidates = {**CANDIDATES, (2, 'DAN'): 21}
+        contests = {**CONTESTS, 'Council': 2}
+        sessions = convert_rows('1,2,3,0,1,1\n2,2,3,1,1,1\n', header, candidates, contests)
+        self.assertEqual(
+            [[contest['Id'] for contest in s['Original']['Contests']] for s in sessions],
+            [[2, 1], [1, 2]]
+        )
+
+
+class OpenOutputTest(unittest.TestCase):
+    def test_gzip_header_records_final_name(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'out.json.gz'
+            with converter.open_output(path, True) as f:
+                f.write(b'{}')
+            data = path.read_bytes()
+            self.assertEqual(sorted(p.name for p in Path(tmp).iterdir()), ['out.json.gz'])
+        # FNAME flag set; the NUL-terminated name follows the 10-byte header
+        self.assertTrue(data[3] & gzip.FNAME)
+        self.assertEqual(data[10:data.index(b'\0', 10)], b'out.json')
+        self.assertEqual(gzip.decompress(data), b'{}')
+
+
+class ConvertDirectoryTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.input_dir = Path(tmp.name) / 'in'
+        self.output_dir = Path(tmp.name) / 'out'
+        self.input_dir.mkdir()
+        self.output_dir.mkdir()
+
+    def test_jobs_give_identical_bytes(self):
+        write_input_dir(self.input_dir, [b'1,2,3,1,0,0\n2,2,3,0,1,1\n', b'3,2,3,0,0,1\n'])
+        for name in ('out.json', 'out.json.gz'):
+            output_path = self.output_dir / name
+            outputs = []
+            for jobs in (1, 2):
+                self.assertTrue(convert_dir(self.input_dir, output_path, jobs=jobs))
+                outputs.append(output_path.read_bytes())
+            with self.subTest(name=name):
+                self.assertEqual(outputs[0], outputs[1])
+                self.assertEqual(sorted(p.name for p in self.output_dir.iterdir()), [name])
+            output_path.unlink()
+
+    def test_failed_file_leaves_no_output(self):
+        # The short row is handed to the csv module, which can't decode it
+        write_input_dir(self.input_dir, [b'1,2,3,1,0,0\n', b'2,2,\xff\n'])
+        for jobs in (1, 2):
+            with self.subTest(jobs=jobs):
+                with self.assertRaises(UnicodeDecodeError):
+                    convert_dir(self.input_dir, self.output_dir / 'out.json', jobs=jobs)
+                self.assertEqual(list(self.output_dir.iterdir()), [])
+
+    def test_jobs_below_one_is_rejected(self):
+        argv = ['convert_csv_to_json.py', str(self.input_dir), 'out.json', '--jobs', '0']
+        with mock.patch.object(sys, 'argv', argv), redirect_stderr(io.StringIO()):
+            with self.assertRaises(SystemExit) as cm:
+                converter.main()
+        self.assertEqual(cm.exception.code, 2)
+
+
+class ShardTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.input_dir = Path(tmp.name) / 'in'
+        self.output_dir = Path(tmp.name) / 'out'
+        self.input_dir.mkdir()
+        self.output_dir.mkdir()
+
+    def output_names(self):
+        return sorted(p.name for p in self.output_dir.iterdir())
+
+    def test_dotted_names_keep_their_dots(self):
+        output_path = Path('sf-2024.11.05.json.gz')
+        self.assertEqual(converter.shard_path(output_path, 7).name, 'sf-2024.11.05.part-007.json.gz')
+        self.assertEqual(
+            converter.shard_manifest_path(output_path).name, 'sf-2024.11.05.json.gz.manifest.json'
+        )
+        self.assertEqual(converter.shard_path(Path('sf-2024.11.05'), 0).name,
+                         'sf-2024.11.05.part-000.json')
+
+    def test_json_and_json_gz_manifests_differ(self):
+        self.assertNotEqual(converter.shard_manifest_path(Path('out.json')),
+                            converter.shard_manifest_path(Path('out.json.gz')))
+
+    def test_shard_per_file_writes_dotted_shards(self):
+        write_input_dir(self.input_dir, [b'1,2,3,1,0,0\n', b'2,2,3,0,1,0\n'])
+        output_path = self.output_dir / 'sf-2024.11.05.json.gz'
+        self.assertTrue(convert_dir(self.input_dir, output_path, jobs=1, shard_per_file=True))
+        self.assertEqual(self.output_names(), [
+            'sf-2024.11.05.json.gz.manifest.json',
+            'sf-2024.11.05.part-000.json.gz',
+            'sf-2024.11.05.part-001.json.gz',
+        ])
+        manifest = json.loads((self.output_dir / 'sf-2024.11.05.json.gz.manifest.json').read_text())
+        self.assertEqual(
+            [(shard['Path'], shard['Source'], shard['Sessions']) for shard in manifest['Shards']],
+            [('sf-2024.11.05.part-000.json.gz', 'CVR_Export_T0.csv', 1),
+             ('sf-2024.11.05.part-001.json.gz', 'CVR_Export_T1.csv', 1)]
+        )
+
+    def test_only_stale_shards_are_removed(self):
+        write_input_dir(self.input_dir, [b'1,2,3,1,0,0\n', b'2,2,3,0,1,0\n'])
+        kept = ['out.part-xyz.json', 'out.part-002.json.gz', 'other.part-002.json', 'out.json']
+        for name in kept + ['out.part-002.json', 'out.part-1000.json']:
+            (self.output_dir / name).write_bytes(b'old')
+        convert_dir(self.input_dir, self.output_dir / 'out.json', jobs=1, shard_per_file=True)
+        self.assertEqual(self.output_names(), sorted(kept + [
+            'out.json.manifest.json', 'out.part-000.json', 'out.part-001.json',
+        ]))
+        self.assertEqual((self.output_dir / 'out.json').read_bytes(), b'old')
+
+    def test_concat_matches_direct_run(self):
+        # The middle file has no votes, so its shard holds no sessions
+        write_input_dir(self.input_dir, [
+            b'1,2,3,1,0,0\n2,2,3,0,1,1\n', b'3,2,3,0,0,0\n', b'4,2,3,0,0,1\n',
+        ])
+        for name in ('out.json', 'out.json.gz'):
+            with self.subTest(name=name):
+                output_path = self.output_dir / name
+                convert_dir(self.input_dir, output_path, jobs=1)
+                direct = output_path.read_bytes()
+                convert_dir(self.input_dir, output_path, jobs=1, shard_per_file=True, concat=True)
+                self.assertEqual(output_path.read_bytes(), direct)
+                with converter.open_input(output_path) as f:
+                    self.assertEqual(len(json.load(f)['Sessions']), 3)
+
+    def test_concat_rejects_malformed_shards(self):
+        prefix = converter.sessions_prefix()
+        shards = {
+            'does not start with the expected header': b'{"Sessions":[{}]}',
+            'does not end with the Sessions array': prefix + b'{}]',
+        }
+        output_path = self.output_dir / 'out.json'
+        for message, data in shards.items():
+            with self.subTest(message=message):
+                shard = self.output_dir / 'shard.json'
+                shard.write_bytes(data)
+                with self.assertRaisesRegex(ValueError, message):
+                    converter.concat_shards([(shard, 1)], output_path, False)
+                self.assertEqual(self.output_names(), ['shard.json'])
+
+
+if __name__ == '__main__':
+    unittest.main()